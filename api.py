@@ -1,18 +1,25 @@
 import asyncio
 import json
-from typing import AsyncGenerator
-from fastapi import FastAPI, HTTPException
+import time
+from typing import AsyncGenerator, Optional
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import os
 
-from agents.plot_agent import PlotAgent
-from agents.character_agent import CharacterAgent
-from agents.setting_agent import SettingAgent
-from agents.dialogue_agent import DialogueAgent
-from agents.conflict_agent import ConflictAgent
-from agents.editor_agent import EditorAgent
+from llm import get_scheduler
+from pipeline import (
+    STAGES,
+    STAGE_INPUTS,
+    STAGE_STEPS,
+    get_stage_runners,
+    revision_timings,
+    stage_args,
+    stages_to_recompute,
+)
+from scheduler import PRIORITIES
+from story_store import get_story_store
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -30,18 +37,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize agents
-plot_agent = PlotAgent()
-character_agent = CharacterAgent()
-setting_agent = SettingAgent()
-dialogue_agent = DialogueAgent()
-conflict_agent = ConflictAgent()
-editor_agent = EditorAgent()
+story_store = get_story_store()
+stage_runners = get_stage_runners()
+scheduler = get_scheduler()
 
 # Pydantic models
 class StoryRequest(BaseModel):
     topic: str
     max_length: int = 2000
+    job_id: Optional[str] = None
+    priority: str = "interactive"  # "interactive" or "batch"
+    deadline_seconds: Optional[float] = None
+
+class RegenerateRequest(BaseModel):
+    stage: str
+    content: str
+    priority: str = "interactive"  # "interactive" or "batch"
+    deadline_seconds: Optional[float] = None
 
 class StreamMessage(BaseModel):
     type: str  # "step", "content", "complete", "error"
@@ -49,120 +61,126 @@ class StreamMessage(BaseModel):
     content: str = None
     progress: float = None
     error: str = None
+    story_id: str = None
 
-async def stream_story_generation(topic: str, max_length: int = 2000) -> AsyncGenerator[str, None]:
-    try:
-        total_steps = 6
-        current_step = 0
-        
-        # Step 1: Plot Development
-        current_step += 1
-        yield json.dumps({
-            "type": "step",
-            "step": "Developing plot...",
-            "progress": current_step / total_steps,
-            "content": None
-        }) + "\n"
-        
-        plot_content = plot_agent.develop_plot(topic)
-        yield json.dumps({
-            "type": "content",
-            "step": "Plot developed",
-            "progress": current_step / total_steps,
-            "content": plot_content
-        }) + "\n"
-        
-        # Step 2: Character Development
-        current_step += 1
+async def stream_stages(
+    stages: list,
+    outputs: dict,
+    timings: dict,
+    priority: str = "interactive",
+    deadline: Optional[float] = None,
+) -> AsyncGenerator[str, None]:
+    """Run the given stages in order, adding each result to outputs and its time to timings."""
+    total_steps = len(stages)
+    for current_step, stage in enumerate(stages, start=1):
+        running, done = STAGE_STEPS[stage]
         yield json.dumps({
             "type": "step",
-            "step": "Developing characters...",
+            "step": running,
             "progress": current_step / total_steps,
             "content": None
         }) + "\n"
         
-        character_content = character_agent.develop_characters(plot_content)
+        started = time.perf_counter()
+        outputs[stage] = await scheduler.run(
+            stage_runners[stage],
+            *stage_args(stage, outputs),
+            priority=priority,
+            deadline=deadline,
+        )
+        timings[stage] = time.perf_counter() - started
         yield json.dumps({
             "type": "content",
-            "step": "Characters developed",
+            "step": done,
             "progress": current_step / total_steps,
-            "content": character_content
+            "content": outputs[stage]
         }) + "\n"
+
+async def stream_story_generation(
+    topic: str,
+    max_length: int = 2000,
+    job_id: Optional[str] = None,
+    priority: str = "interactive",
+    deadline_seconds: Optional[float] = None,
+) -> AsyncGenerator[str, None]:
+    try:
+        # One deadline for the whole story, so all of its calls share it
+        deadline = None if deadline_seconds is None else time.monotonic() + deadline_seconds
+        outputs = {"topic": topic}
+        timings = {}
         
-        # Step 3: Setting Creation
-        current_step += 1
-        yield json.dumps({
-            "type": "step",
-            "step": "Creating setting...",
-            "progress": current_step / total_steps,
-            "content": None
-        }) + "\n"
+        async for message in stream_stages(STAGES, outputs, timings, priority, deadline):
+            yield message
         
-        setting_content = setting_agent.create_setting(character_content, plot_content)
-        yield json.dumps({
-            "type": "content",
-            "step": "Setting created",
-            "progress": current_step / total_steps,
-            "content": setting_content
-        }) + "\n"
+        # Persist all stage outputs so the story can be re-read later
+        story_id = story_store.save_story(
+            topic,
+            {stage: outputs[stage] for stage in STAGES},
+            timings=timings,
+            metadata={"max_length": max_length, "priority": priority},
+            job_id=job_id,
+        )
         
-        # Step 4: Conflict Generation
-        current_step += 1
-        yield json.dumps({
-            "type": "step",
-            "step": "Generating conflicts...",
-            "progress": current_step / total_steps,
-            "content": None
-        }) + "\n"
-        
-        conflict_content = conflict_agent.generate_conflicts(setting_content, character_content)
+        # Complete
         yield json.dumps({
-            "type": "content",
-            "step": "Conflicts generated",
-            "progress": current_step / total_steps,
-            "content": conflict_content
+            "type": "complete",
+            "step": "Story generation complete",
+            "progress": 1.0,
+            "content": outputs["final_story"],
+            "story_id": story_id
         }) + "\n"
         
-        # Step 5: Dialogue Writing
-        current_step += 1
+    except Exception as e:
         yield json.dumps({
-            "type": "step",
-            "step": "Writing dialogue...",
-            "progress": current_step / total_steps,
-            "content": None
+            "type": "error",
+            "step": "Error occurred",
+            "progress": 0.0,
+            "error": str(e)
         }) + "\n"
+
+async def stream_story_regeneration(
+    story: dict,
+    stages: dict,
+    edited_stage: str,
+    content: str,
+    priority: str = "interactive",
+    deadline_seconds: Optional[float] = None,
+) -> AsyncGenerator[str, None]:
+    try:
+        deadline = None if deadline_seconds is None else time.monotonic() + deadline_seconds
+        recompute = stages_to_recompute(edited_stage)
+        timings, reused = revision_timings(story["timings"], edited_stage, recompute)
         
-        dialogue_content = dialogue_agent.write_dialogue(conflict_content, setting_content)
-        yield json.dumps({
-            "type": "content",
-            "step": "Dialogue written",
-            "progress": current_step / total_steps,
-            "content": dialogue_content
-        }) + "\n"
+        # Upstream stages are reused as saved; only dependents of the edit are rerun
+        outputs = dict(stages)
+        outputs["topic"] = story["topic"]
+        outputs[edited_stage] = content
         
-        # Step 6: Final Editing
-        current_step += 1
-        yield json.dumps({
-            "type": "step",
-            "step": "Final editing...",
-            "progress": current_step / total_steps,
-            "content": None
-        }) + "\n"
+        async for message in stream_stages(recompute, outputs, timings, priority, deadline):
+            yield message
         
-        final_story = editor_agent.edit_story(dialogue_content, conflict_content)
-        yield json.dumps({
-            "type": "content",
-            "step": "Story completed",
-            "progress": 1.0,
-            "content": final_story
-        }) + "\n"
+        # Save the revision as a new story that points back to the one it came from
+        story_id = story_store.save_story(
+            story["topic"],
+            {stage: outputs[stage] for stage in stages},
+            timings=timings,
+            metadata={
+                **story["metadata"],
+                "priority": priority,
+                "parent_story_id": story["id"],
+                "edited_stage": edited_stage,
+                "recomputed_stages": recompute,
+                "reused_stages": reused,
+            },
+            job_id=story["job_id"],
+        )
         
-        # Complete
         yield json.dumps({
             "type": "complete",
-            "step": "Story generation complete",
+            "step": "Story regeneration complete",
             "progress": 1.0,
-            "content": final_story
+            "content": outputs["final_story"],
+            "story_id": story_id
         }) + "\n"
         
     except Exception as e:
@@ -180,6 +198,11 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /generate-story": "Generate a story with streaming response",
+            "GET /stories": "List saved stories with cursor pagination",
+            "GET /stories/{story_id}": "Get a saved story's metadata and timings",
+            "GET /stories/{story_id}/stages/{stage}": "Stream a saved story stage, optionally a character range",
+            "POST /stories/{story_id}/regenerate": "Replace one stage of a saved story and recompute only the stages that depend on it",
+            "GET /scheduler": "LLM call scheduler limit and current load",
             "GET /health": "Health check endpoint"
         }
     }
@@ -195,16 +218,133 @@ async def generate_story(request: StoryRequest):
     Generate a story with streaming response.
     
     Args:
-        request: StoryRequest containing topic and max_length
+        request: StoryRequest containing topic, max_length and scheduling options
         
     Returns:
         StreamingResponse with JSON chunks
     """
     if not request.topic.strip():
         raise HTTPException(status_code=400, detail="Topic cannot be empty")
+    if request.priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Priority must be one of: {', '.join(PRIORITIES)}")
+    if request.deadline_seconds is not None and request.deadline_seconds <= 0:
+        raise HTTPException(status_code=400, detail="deadline_seconds must be positive")
     
     return StreamingResponse(
-        stream_story_generation(request.topic, request.max_length),
+        stream_story_generation(
+            request.topic,
+            request.max_length,
+            request.job_id,
+            request.priority,
+            request.deadline_seconds,
+        ),
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Content-Type": "application/x-ndjson",
+        }
+    )
+
+@app.get("/stories")
+async def list_stories(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    topic: Optional[str] = None,
+    job_id: Optional[str] = None,
+):
+    """
+    List saved stories, newest first.
+    
+    Args:
+        limit: Maximum number of stories per page
+        cursor: The next_cursor value from the previous page
+        topic: Only return stories with this topic
+        job_id: Only return stories with this job ID
+        
+    Returns:
+        Story summaries and the cursor for the next page
+    """
+    try:
+        stories, next_cursor = story_store.list_stories(limit, cursor, topic, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"stories": stories, "next_cursor": next_cursor}
+
+@app.get("/stories/{story_id}")
+async def get_story(story_id: str):
+    """Get a saved story's metadata, timings and stage sizes."""
+    story = story_store.get_story(story_id)
+    if story is None:
+        raise HTTPException(status_code=404, detail="Story not found")
+    return story
+
+@app.get("/stories/{story_id}/stages/{stage}")
+def get_story_stage(
+    story_id: str,
+    stage: str,
+    start: int = Query(0, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+):
+    """
+    Stream the content of one stage of a saved story.
+    
+    Args:
+        story_id: The story ID
+        stage: The stage name, e.g. "final_story"
+        start: Offset of the first character to return
+        end: Offset one past the last character to return
+        
+    Returns:
+        StreamingResponse with the requested text range
+    """
+    length = story_store.stage_length(story_id, stage)
+    if length is None:
+        raise HTTPException(status_code=404, detail="Story stage not found")
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    
+    return StreamingResponse(
+        story_store.iter_stage(story_id, stage, start, end),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Content-Length-Chars": str(length)}
+    )
+
+@app.post("/stories/{story_id}/regenerate")
+async def regenerate_story(story_id: str, request: RegenerateRequest):
+    """
+    Replace one stage of a saved story and recompute only its dependents.
+    
+    Args:
+        story_id: The story to revise
+        request: RegenerateRequest containing the edited stage and its new content
+        
+    Returns:
+        StreamingResponse with JSON chunks, ending with the ID of the new story
+    """
+    if request.stage not in STAGE_INPUTS:
+        raise HTTPException(status_code=400, detail=f"Stage must be one of: {', '.join(STAGE_INPUTS)}")
+    if not request.content.strip():
+        raise HTTPException(status_code=400, detail="Content cannot be empty")
+    if request.priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Priority must be one of: {', '.join(PRIORITIES)}")
+    if request.deadline_seconds is not None and request.deadline_seconds <= 0:
+        raise HTTPException(status_code=400, detail="deadline_seconds must be positive")
+    
+    story = story_store.get_story(story_id)
+    stages = story_store.get_stages(story_id)
+    if story is None or stages is None:
+        raise HTTPException(status_code=404, detail="Story not found")
+    
+    return StreamingResponse(
+        stream_story_regeneration(
+            story,
+            stages,
+            request.stage,
+            request.content,
+            request.priority,
+            request.deadline_seconds,
+        ),
         media_type="application/x-ndjson",
         headers={
             "Cache-Control": "no-cache",
@@ -223,6 +363,14 @@ async def get_config():
         "max_tokens": int(os.getenv("MAX_TOKENS", "2000"))
     }
 
+@app.get("/scheduler")
+async def get_scheduler_status():
+    """Get the LLM call scheduler's concurrency limit and current load."""
+    return {
+        "max_concurrency": scheduler.max_concurrent,
+        **scheduler.stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
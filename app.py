@@ -1,47 +1,80 @@
 import os
-from agents.plot_agent import PlotAgent
-from agents.character_agent import CharacterAgent
-from agents.setting_agent import SettingAgent
-from agents.dialogue_agent import DialogueAgent
-from agents.conflict_agent import ConflictAgent
-from agents.editor_agent import EditorAgent
+import time
+from pipeline import (
+    STAGES,
+    STAGE_STEPS,
+    get_stage_runners,
+    revision_timings,
+    stage_args,
+    stages_to_recompute,
+)
+from story_store import get_story_store
 
-plot_agent = PlotAgent()
-character_agent = CharacterAgent()
-setting_agent = SettingAgent()
-dialogue_agent = DialogueAgent()
-conflict_agent = ConflictAgent()
-editor_agent = EditorAgent()
+story_store = get_story_store()
+stage_runners = get_stage_runners()
+
+
+def run_stages(stages, outputs, timings):
+    for current_step, stage in enumerate(stages, start=1):
+        running, done = STAGE_STEPS[stage]
+        print(f"Step {current_step}: {running}")
+        started = time.perf_counter()
+        outputs[stage] = stage_runners[stage](*stage_args(stage, outputs))
+        timings[stage] = time.perf_counter() - started
+        print(f"{done}: {len(outputs[stage])} characters")
 
 
 def run_story_workflow(topic):
     print("Running story generation workflow...")
+    outputs = {"topic": topic}
+    timings = {}
+    
+    run_stages(STAGES, outputs, timings)
     
-    print("Step 1: Developing plot...")
-    plot_content = plot_agent.develop_plot(topic)
-    print(f"Plot developed: {len(plot_content)} characters")
+    story_id = story_store.save_story(
+        topic,
+        {stage: outputs[stage] for stage in STAGES},
+        timings=timings,
+    )
+    print(f"Story saved: {story_id}")
+    
+    return outputs["final_story"]
+
+
+def run_incremental_workflow(story_id, edited_stage, content):
+    print("Running incremental story workflow...")
     
-    print("Step 2: Developing characters...")
-    character_content = character_agent.develop_characters(plot_content)
-    print(f"Characters developed: {len(character_content)} characters")
+    story = story_store.get_story(story_id)
+    stages = story_store.get_stages(story_id)
+    if story is None or stages is None:
+        raise ValueError(f"Story not found: {story_id}")
     
-    print("Step 3: Creating setting...")
-    setting_content = setting_agent.create_setting(character_content, plot_content)
-    print(f"Setting created: {len(setting_content)} characters")
+    recompute = stages_to_recompute(edited_stage)
+    timings, reused = revision_timings(story["timings"], edited_stage, recompute)
+    print(f"Recomputing: {', '.join(recompute) or 'nothing'}")
     
-    print("Step 4: Generating conflicts...")
-    conflict_content = conflict_agent.generate_conflicts(setting_content, character_content)
-    print(f"Conflicts generated: {len(conflict_content)} characters")
+    outputs = dict(stages)
+    outputs["topic"] = story["topic"]
+    outputs[edited_stage] = content
     
-    print("Step 5: Writing dialogue...")
-    dialogue_content = dialogue_agent.write_dialogue(conflict_content, setting_content)
-    print(f"Dialogue written: {len(dialogue_content)} characters")
+    run_stages(recompute, outputs, timings)
     
-    print("Step 6: Final editing...")
-    final_story = editor_agent.edit_story(dialogue_content, conflict_content)
-    print(f"Final story: {len(final_story)} characters")
+    new_story_id = story_store.save_story(
+        story["topic"],
+        {stage: outputs[stage] for stage in stages},
+        timings=timings,
+        metadata={
+            **story["metadata"],
+            "parent_story_id": story_id,
+            "edited_stage": edited_stage,
+            "recomputed_stages": recompute,
+            "reused_stages": reused,
+        },
+        job_id=story["job_id"],
+    )
+    print(f"Story saved: {new_story_id}")
     
-    return final_story
+    return outputs["final_story"]
 
 if __name__ == "__main__":
     topic = "In a world where magic has been outlawed, a young sorcerer discovers an ancient artifact that could change everything."
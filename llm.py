@@ -5,6 +5,7 @@ Configure via environment variables.
 
 import os
 from langchain.llms import OpenAI
+from scheduler import LLMScheduler
 
 llm = OpenAI(
     model_name=os.getenv("OPENAI_MODEL_NAME", "llama3.2"),
@@ -14,6 +15,15 @@ llm = OpenAI(
     max_tokens=int(os.getenv("MAX_TOKENS", "2000"))
 )
 
+# All agents share this backend, so one scheduler caps its concurrent calls.
+scheduler = LLMScheduler(
+    max_concurrent=int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+)
+
 def get_llm():
     """Get the LLM instance."""
     return llm
+
+def get_scheduler():
+    """Get the LLM call scheduler."""
+    return scheduler
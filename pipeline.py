@@ -0,0 +1,113 @@
+"""
+Pipeline module - Stages of the story workflow, their dependencies and the agent calls that produce them.
+Both the API and the command line run stages from these tables.
+"""
+
+# Stages in the order the workflow runs them.
+STAGES = [
+    "plot_content",
+    "character_content",
+    "setting_content",
+    "conflict_content",
+    "dialogue_content",
+    "final_story",
+]
+
+# The inputs each stage's agent is called with, in argument order.
+STAGE_INPUTS = {
+    "plot_content": ("topic",),
+    "character_content": ("plot_content",),
+    "setting_content": ("character_content", "plot_content"),
+    "conflict_content": ("setting_content", "character_content"),
+    "dialogue_content": ("conflict_content", "setting_content"),
+    "final_story": ("dialogue_content", "conflict_content"),
+}
+
+# Progress labels shown while a stage runs and once it is done.
+STAGE_STEPS = {
+    "plot_content": ("Developing plot...", "Plot developed"),
+    "character_content": ("Developing characters...", "Characters developed"),
+    "setting_content": ("Creating setting...", "Setting created"),
+    "conflict_content": ("Generating conflicts...", "Conflicts generated"),
+    "dialogue_content": ("Writing dialogue...", "Dialogue written"),
+    "final_story": ("Final editing...", "Story completed"),
+}
+
+_stage_runners = None
+
+def get_stage_runners():
+    """Get the agent call for each stage, creating the agents on first use."""
+    global _stage_runners
+    if _stage_runners is None:
+        from agents.plot_agent import PlotAgent
+        from agents.character_agent import CharacterAgent
+        from agents.setting_agent import SettingAgent
+        from agents.dialogue_agent import DialogueAgent
+        from agents.conflict_agent import ConflictAgent
+        from agents.editor_agent import EditorAgent
+
+        _stage_runners = {
+            "plot_content": PlotAgent().develop_plot,
+            "character_content": CharacterAgent().develop_characters,
+            "setting_content": SettingAgent().create_setting,
+            "conflict_content": ConflictAgent().generate_conflicts,
+            "dialogue_content": DialogueAgent().write_dialogue,
+            "final_story": EditorAgent().edit_story,
+        }
+    return _stage_runners
+
+def stage_args(stage, outputs):
+    """
+    Get the arguments to call a stage's agent with.
+
+    Args:
+        stage (str): The stage to run
+        outputs (dict): The topic and the outputs of the stages run so far
+
+    Returns:
+        list: The stage's inputs in argument order
+    """
+    return [outputs[name] for name in STAGE_INPUTS[stage]]
+
+def stages_to_recompute(edited_stage):
+    """
+    Get the stages that depend, directly or indirectly, on an edited stage.
+
+    Args:
+        edited_stage (str): The stage whose output was changed
+
+    Returns:
+        list: The dependent stages in workflow order
+    """
+    if edited_stage not in STAGE_INPUTS:
+        raise ValueError(f"Unknown stage: {edited_stage}")
+
+    changed = {edited_stage}
+    recompute = []
+    for stage in STAGES:
+        if any(name in changed for name in STAGE_INPUTS[stage]):
+            changed.add(stage)
+            recompute.append(stage)
+    return recompute
+
+def revision_timings(parent_timings, edited_stage, recompute):
+    """
+    Get the timings to save for a revision of a story.
+
+    Stages reused unchanged keep the parent's timings. The edited stage has
+    no timing because its content was not generated.
+
+    Args:
+        parent_timings (dict): Stage name to elapsed seconds for the parent story
+        edited_stage (str): The stage whose output was changed
+        recompute (list): The stages that were recomputed
+
+    Returns:
+        tuple: (timings for the reused stages, list of reused stages)
+    """
+    reused = [
+        stage for stage in STAGES
+        if stage != edited_stage and stage not in recompute
+    ]
+    timings = {stage: parent_timings[stage] for stage in reused if stage in parent_timings}
+    return timings, reused
@@ -0,0 +1,107 @@
+"""
+LLM call scheduler - Shared by all agent calls to order and limit calls to a backend.
+Calls are granted in priority order, then earliest deadline first.
+"""
+
+import asyncio
+import functools
+import heapq
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+# Lower values are served first.
+PRIORITIES = {
+    "interactive": 0,
+    "batch": 1,
+}
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrent):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent (int): Maximum number of calls running against the backend at once
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self._active = 0
+        self._waiting = []
+        self._counter = itertools.count()
+        # Only granted calls reach the executor, so its workers are never
+        # taken by calls that are still waiting for their turn.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix="llm-call"
+        )
+
+    async def run(self, fn, *args, priority="interactive", deadline=None):
+        """
+        Run a blocking LLM call once the scheduler grants it a slot.
+
+        Waiting calls are ordered by priority, then by deadline (calls without
+        one go last), then by arrival. Batch calls therefore only start when no
+        interactive call is waiting.
+
+        Args:
+            fn (callable): The blocking call to make, e.g. an agent method
+            *args: Positional arguments for fn
+            priority (str): One of the keys of PRIORITIES
+            deadline (float): Absolute time.monotonic() deadline, or None for no deadline
+
+        Returns:
+            The result of fn
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        await self._acquire(PRIORITIES[priority], deadline)
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, functools.partial(fn, *args))
+        except BaseException:
+            self._release()
+            raise
+
+        # The slot is held until the thread finishes, even if the caller is
+        # cancelled, since the call keeps running against the backend.
+        future.add_done_callback(self._call_done)
+        return await asyncio.shield(future)
+
+    def stats(self):
+        """Get the number of running and waiting calls."""
+        waiting = sum(1 for *_, future in self._waiting if not future.cancelled())
+        return {"active": self._active, "waiting": waiting}
+
+    async def _acquire(self, priority, deadline):
+        if self._active < self.max_concurrent and not self._waiting:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        key = (priority, math.inf if deadline is None else deadline, next(self._counter))
+        heapq.heappush(self._waiting, (*key, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation.
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _call_done(self, future):
+        if not future.cancelled():
+            # Mark the result as retrieved in case the caller was cancelled.
+            future.exception()
+        self._release()
+
+    def _release(self):
+        # Hand the slot straight to the next waiter, skipping cancelled ones.
+        while self._waiting:
+            *_, future = heapq.heappop(self._waiting)
+            if not future.cancelled():
+                future.set_result(None)
+                return
+        self._active -= 1
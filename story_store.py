@@ -0,0 +1,313 @@
+"""
+Story store module - Persists finished stories to a local SQLite database.
+Configure via environment variables.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+
+CHUNK_SIZE = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    id TEXT PRIMARY KEY,
+    job_id TEXT,
+    topic TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    metadata TEXT NOT NULL,
+    timings TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS story_stages (
+    story_id TEXT NOT NULL REFERENCES stories(id),
+    stage TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    PRIMARY KEY (story_id, stage)
+);
+CREATE TABLE IF NOT EXISTS story_chunks (
+    story_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    char_offset INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (story_id, stage, char_offset),
+    FOREIGN KEY (story_id, stage) REFERENCES story_stages(story_id, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_stories_created ON stories(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_stories_topic ON stories(topic, created_at);
+CREATE INDEX IF NOT EXISTS idx_stories_job ON stories(job_id);
+"""
+
+
+class StoryStore:
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        """
+        Initialize the story store.
+
+        Stage content is split into rows of chunk_size characters, so ranges
+        can be read without loading a whole stage.
+
+        Args:
+            path (str): Path to the SQLite database file
+            chunk_size (int): Number of characters per stored chunk
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # A short-lived connection per call keeps the store safe to use from
+        # the API's worker threads without sharing a connection between them.
+        return sqlite3.connect(self.path)
+
+    def save_story(self, topic, stages, timings=None, metadata=None, job_id=None):
+        """
+        Save the outputs of a pipeline run.
+
+        Stories are only ever inserted, never updated, so a saved story is immutable.
+
+        Args:
+            topic (str): The story topic or idea
+            stages (dict): Stage name to generated content, in pipeline order
+            timings (dict): Stage name to elapsed seconds
+            metadata (dict): Extra information about the run
+            job_id (str): Optional caller-supplied job identifier
+
+        Returns:
+            str: The ID of the saved story
+        """
+        story_id = uuid.uuid4().hex
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO stories (id, job_id, topic, created_at, metadata, timings) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    story_id,
+                    job_id,
+                    topic,
+                    time.time(),
+                    json.dumps(metadata or {}),
+                    json.dumps(timings or {}),
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO story_stages (story_id, stage, position, length) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (story_id, stage, position, len(content))
+                    for position, (stage, content) in enumerate(stages.items())
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO story_chunks (story_id, stage, char_offset, content) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (story_id, stage, offset, content[offset:offset + self.chunk_size])
+                    for stage, content in stages.items()
+                    for offset in range(0, len(content), self.chunk_size)
+                ],
+            )
+        return story_id
+
+    def list_stories(self, limit=20, cursor=None, topic=None, job_id=None):
+        """
+        List stories, newest first, without loading their content.
+
+        Args:
+            limit (int): Maximum number of stories to return
+            cursor (str): Cursor returned by a previous call, or None for the first page
+            topic (str): Only return stories with this exact topic
+            job_id (str): Only return stories with this job ID
+
+        Returns:
+            tuple: (list of story summaries, next cursor or None)
+        """
+        clauses = []
+        params = []
+        if topic is not None:
+            clauses.append("s.topic = ?")
+            params.append(topic)
+        if job_id is not None:
+            clauses.append("s.job_id = ?")
+            params.append(job_id)
+        if cursor:
+            created_at, story_id = _decode_cursor(cursor)
+            clauses.append("(s.created_at < ? OR (s.created_at = ? AND s.id < ?))")
+            params.extend([created_at, created_at, story_id])
+
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        query = (
+            "SELECT s.id, s.job_id, s.topic, s.created_at, s.metadata, s.timings "
+            "FROM stories s " + where + " "
+            "ORDER BY s.created_at DESC, s.id DESC LIMIT ?"
+        )
+        # Fetch one extra row to know whether another page exists.
+        params.append(limit + 1)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            stories = self._summaries(conn, rows)
+
+        next_cursor = None
+        if has_more:
+            last = stories[-1]
+            next_cursor = _encode_cursor(last["created_at"], last["id"])
+        return stories, next_cursor
+
+    def get_story(self, story_id):
+        """
+        Get a story's metadata and the size of each stage, without its content.
+
+        Args:
+            story_id (str): The story ID
+
+        Returns:
+            dict: The story summary, or None if it does not exist
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, job_id, topic, created_at, metadata, timings "
+                "FROM stories WHERE id = ?",
+                (story_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            return self._summaries(conn, [row])[0]
+
+    def get_stages(self, story_id):
+        """
+        Load the full content of every stage of a story.
+
+        Args:
+            story_id (str): The story ID
+
+        Returns:
+            dict: Stage name to content in pipeline order, or None if the story does not exist
+        """
+        with closing(self._connect()) as conn:
+            stages = [
+                stage for (stage,) in conn.execute(
+                    "SELECT stage FROM story_stages WHERE story_id = ? ORDER BY position",
+                    (story_id,),
+                )
+            ]
+            if not stages:
+                return None
+            return {
+                stage: "".join(
+                    content for (content,) in conn.execute(
+                        "SELECT content FROM story_chunks "
+                        "WHERE story_id = ? AND stage = ? ORDER BY char_offset",
+                        (story_id, stage),
+                    )
+                )
+                for stage in stages
+            }
+
+    def stage_length(self, story_id, stage):
+        """
+        Get the length of a stage's content in characters.
+
+        Args:
+            story_id (str): The story ID
+            stage (str): The stage name
+
+        Returns:
+            int: The content length, or None if the stage does not exist
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT length FROM story_stages WHERE story_id = ? AND stage = ?",
+                (story_id, stage),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def iter_stage(self, story_id, stage, start=0, end=None):
+        """
+        Stream a character range of a stage's content in chunks.
+
+        Only the stored chunks overlapping the range are read, one at a time,
+        so large stories can be served without loading them fully.
+
+        Args:
+            story_id (str): The story ID
+            stage (str): The stage name
+            start (int): Offset of the first character to return
+            end (int): Offset one past the last character, or None for the end
+
+        Yields:
+            str: Consecutive pieces of the requested range
+        """
+        length = self.stage_length(story_id, stage)
+        if length is None:
+            return
+        end = length if end is None else min(end, length)
+        if start >= end:
+            return
+
+        with closing(self._connect()) as conn:
+            # Start from the last chunk beginning at or before start.
+            rows = conn.execute(
+                "SELECT char_offset, content FROM story_chunks "
+                "WHERE story_id = ? AND stage = ? AND char_offset < ? AND char_offset >= ("
+                "    SELECT MAX(char_offset) FROM story_chunks "
+                "    WHERE story_id = ? AND stage = ? AND char_offset <= ?"
+                ") ORDER BY char_offset",
+                (story_id, stage, end, story_id, stage, start),
+            )
+            for offset, content in rows:
+                piece = content[max(start - offset, 0):end - offset]
+                if piece:
+                    yield piece
+
+    def _summaries(self, conn, rows):
+        # Stage sizes for every story on the page come from one query.
+        sizes = {row[0]: [] for row in rows}
+        if sizes:
+            placeholders = ", ".join("?" * len(sizes))
+            for story_id, stage, length in conn.execute(
+                "SELECT story_id, stage, length FROM story_stages "
+                "WHERE story_id IN (" + placeholders + ") ORDER BY story_id, position",
+                list(sizes),
+            ):
+                sizes[story_id].append({"stage": stage, "length": length})
+
+        return [
+            {
+                "id": story_id,
+                "job_id": job_id,
+                "topic": topic,
+                "created_at": created_at,
+                "metadata": json.loads(metadata),
+                "timings": json.loads(timings),
+                "stages": sizes[story_id],
+            }
+            for story_id, job_id, topic, created_at, metadata, timings in rows
+        ]
+
+
+def _encode_cursor(created_at, story_id):
+    raw = json.dumps([created_at, story_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        created_at, story_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(created_at), str(story_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+story_store = StoryStore(os.getenv("STORY_DB_PATH", "stories.db"))
+
+def get_story_store():
+    """Get the story store instance."""
+    return story_store
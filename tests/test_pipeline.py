@@ -0,0 +1,55 @@
+import pytest
+
+from pipeline import STAGES, revision_timings, stage_args, stages_to_recompute
+
+
+@pytest.mark.parametrize("edited_stage, expected", [
+    ("plot_content", [
+        "character_content",
+        "setting_content",
+        "conflict_content",
+        "dialogue_content",
+        "final_story",
+    ]),
+    ("character_content", [
+        "setting_content",
+        "conflict_content",
+        "dialogue_content",
+        "final_story",
+    ]),
+    ("setting_content", ["conflict_content", "dialogue_content", "final_story"]),
+    ("conflict_content", ["dialogue_content", "final_story"]),
+    ("dialogue_content", ["final_story"]),
+    ("final_story", []),
+])
+def test_stages_to_recompute(edited_stage, expected):
+    assert stages_to_recompute(edited_stage) == expected
+
+
+def test_stages_to_recompute_rejects_unknown_stage():
+    with pytest.raises(ValueError):
+        stages_to_recompute("epilogue")
+
+
+def test_revision_timings_keeps_only_reused_stages():
+    parent_timings = {stage: float(i) for i, stage in enumerate(STAGES)}
+    recompute = stages_to_recompute("setting_content")
+
+    timings, reused = revision_timings(parent_timings, "setting_content", recompute)
+
+    assert reused == ["plot_content", "character_content"]
+    assert timings == {"plot_content": 0.0, "character_content": 1.0}
+
+
+def test_revision_timings_skips_missing_parent_timings():
+    timings, reused = revision_timings({}, "final_story", [])
+
+    assert reused == STAGES[:-1]
+    assert timings == {}
+
+
+def test_stage_args_follow_input_order():
+    outputs = {"topic": "t", "plot_content": "p", "character_content": "c"}
+
+    assert stage_args("plot_content", outputs) == ["t"]
+    assert stage_args("setting_content", outputs) == ["c", "p"]
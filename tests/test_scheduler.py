@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+from scheduler import LLMScheduler
+
+
+async def _submit_all(scheduler, calls):
+    """Start the first call, queue the rest behind it, then let them all run."""
+    order = []
+    gate = threading.Event()
+
+    def record(name):
+        if name == calls[0][0]:
+            gate.wait()
+        order.append(name)
+
+    tasks = []
+    for name, priority, deadline in calls:
+        tasks.append(asyncio.create_task(
+            scheduler.run(record, name, priority=priority, deadline=deadline)
+        ))
+        # Let each call reach the scheduler before the next is submitted.
+        await asyncio.sleep(0.01)
+
+    gate.set()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_interactive_call_runs_before_queued_batch_calls():
+    scheduler = LLMScheduler(1)
+    calls = [(f"b{i}", "batch", None) for i in range(10)] + [("I", "interactive", None)]
+
+    order = asyncio.run(_submit_all(scheduler, calls))
+
+    assert order == ["b0", "I"] + [f"b{i}" for i in range(1, 10)]
+
+
+def test_earliest_deadline_first_within_priority():
+    scheduler = LLMScheduler(1)
+    calls = [
+        ("first", "batch", None),
+        ("no-deadline", "interactive", None),
+        ("late", "interactive", 100.0),
+        ("early", "interactive", 5.0),
+        ("batch-early", "batch", 1.0),
+    ]
+
+    order = asyncio.run(_submit_all(scheduler, calls))
+
+    assert order == ["first", "early", "late", "no-deadline", "batch-early"]
+
+
+def test_concurrent_calls_are_capped():
+    scheduler = LLMScheduler(2)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def call():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        threading.Event().wait(0.02)
+        with lock:
+            running[0] -= 1
+
+    async def main():
+        await asyncio.gather(*(scheduler.run(call) for _ in range(8)))
+
+    asyncio.run(main())
+
+    assert peak[0] == 2
+    assert scheduler.stats() == {"active": 0, "waiting": 0}
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    scheduler = LLMScheduler(1)
+    gate = threading.Event()
+
+    async def main():
+        blocker = asyncio.create_task(scheduler.run(gate.wait))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(scheduler.run(lambda: None))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        gate.set()
+        await blocker
+        assert await scheduler.run(lambda: "ok") == "ok"
+
+    asyncio.run(main())
+
+    assert scheduler.stats() == {"active": 0, "waiting": 0}
+
+
+def test_cancelled_running_call_keeps_slot_until_thread_finishes():
+    scheduler = LLMScheduler(1)
+    gate = threading.Event()
+    order = []
+
+    def record(name):
+        if name == "running":
+            gate.wait()
+        order.append(name)
+
+    async def main():
+        running = asyncio.create_task(scheduler.run(record, "running"))
+        await asyncio.sleep(0.01)
+        batch = asyncio.create_task(scheduler.run(record, "batch", priority="batch"))
+        await asyncio.sleep(0.01)
+        running.cancel()
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(scheduler.run(record, "interactive"))
+        await asyncio.sleep(0.01)
+
+        assert scheduler.stats() == {"active": 1, "waiting": 2}
+
+        gate.set()
+        await asyncio.gather(batch, interactive)
+
+    asyncio.run(main())
+
+    assert order == ["running", "interactive", "batch"]
+    assert scheduler.stats() == {"active": 0, "waiting": 0}
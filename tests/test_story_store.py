@@ -0,0 +1,100 @@
+import pytest
+
+import story_store
+from story_store import StoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StoryStore(str(tmp_path / "stories.db"), chunk_size=4)
+
+
+def _ids(stories):
+    return [story["id"] for story in stories]
+
+
+def _all_pages(store, limit, **filters):
+    pages = []
+    cursor = None
+    while True:
+        stories, cursor = store.list_stories(limit, cursor, **filters)
+        pages.append(_ids(stories))
+        if cursor is None:
+            return pages
+
+
+def test_pagination_has_no_duplicates_or_gaps(store, monkeypatch):
+    # Several stories share a created_at, so the cursor must break ties on ID.
+    times = iter([1.0, 2.0, 2.0, 2.0, 2.0, 3.0, 3.0])
+    monkeypatch.setattr(story_store.time, "time", lambda: next(times))
+    saved = [store.save_story("topic", {"final_story": "text"}) for _ in range(7)]
+
+    pages = _all_pages(store, 2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    listed = [story_id for page in pages for story_id in page]
+    assert sorted(listed) == sorted(saved)
+    assert listed == _ids(store.list_stories(10)[0])
+
+
+def test_filters_by_topic_and_job_id(store):
+    dragons = store.save_story("dragons", {"final_story": "a"}, job_id="job-1")
+    owls = store.save_story("owls", {"final_story": "b"}, job_id="job-1")
+    store.save_story("owls", {"final_story": "c"}, job_id="job-2")
+
+    assert _ids(store.list_stories(10, topic="dragons")[0]) == [dragons]
+    assert set(_ids(store.list_stories(10, job_id="job-1")[0])) == {dragons, owls}
+    assert _ids(store.list_stories(10, topic="owls", job_id="job-1")[0]) == [owls]
+    pages = _all_pages(store, 1, topic="owls")
+    assert [len(page) for page in pages] == [1, 1]
+    assert owls in pages[0] + pages[1]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24=", "WzFd"])
+def test_rejects_bad_cursor(store, cursor):
+    with pytest.raises(ValueError):
+        store.list_stories(10, cursor)
+
+
+def test_summary_reports_stage_sizes_and_timings(store):
+    story_id = store.save_story(
+        "topic",
+        {"plot_content": "plot", "final_story": "é" * 9},
+        timings={"plot_content": 1.5},
+        metadata={"max_length": 100},
+        job_id="job",
+    )
+
+    story = store.get_story(story_id)
+
+    assert story["stages"] == [
+        {"stage": "plot_content", "length": 4},
+        {"stage": "final_story", "length": 9},
+    ]
+    assert story["timings"] == {"plot_content": 1.5}
+    assert story["metadata"] == {"max_length": 100}
+    assert store.get_stages(story_id) == {"plot_content": "plot", "final_story": "é" * 9}
+    assert store.get_story("missing") is None
+
+
+def test_iter_stage_ranges_over_multibyte_text(store):
+    text = "héllo wörld, ドラゴンの物語 🐉 end"
+    story_id = store.save_story("topic", {"final_story": text})
+
+    assert store.stage_length(story_id, "final_story") == len(text)
+    assert "".join(store.iter_stage(story_id, "final_story")) == text
+    for start in range(len(text) + 1):
+        for end in range(start, len(text) + 1):
+            pieces = list(store.iter_stage(story_id, "final_story", start, end))
+            assert "".join(pieces) == text[start:end]
+            assert all(len(piece) <= 4 for piece in pieces)
+
+
+def test_iter_stage_start_past_end(store):
+    story_id = store.save_story("topic", {"final_story": "short", "empty": ""})
+
+    assert list(store.iter_stage(story_id, "final_story", 10)) == []
+    assert list(store.iter_stage(story_id, "final_story", 5)) == []
+    assert "".join(store.iter_stage(story_id, "final_story", 3, 100)) == "rt"
+    assert list(store.iter_stage(story_id, "empty")) == []
+    assert list(store.iter_stage(story_id, "missing")) == []